@@ -1,14 +1,56 @@
+import json
 import time
 import requests
 import os
 
 API_BASE = os.environ.get("CDS_API_BASE", "http://localhost:8000")
 
+# Keep-alive session reused across polls, plus the last payload and its ETag
+# so unchanged scorecards come back as an empty 304 response.
+_SESSION = requests.Session()
+_last_response = {"etag": None, "data": None}
+
 def fetch_latest_scorecards():
     url = f"{API_BASE}/cds/scorecards/latest"
-    r = requests.get(url, timeout=5)
+    headers = {}
+    if _last_response["etag"] is not None:
+        headers["If-None-Match"] = _last_response["etag"]
+    r = _SESSION.get(url, headers=headers, timeout=5)
+    if r.status_code == 304:
+        return _last_response["data"]
     r.raise_for_status()
-    return r.json()
+    data = r.json()
+    _last_response["etag"] = r.headers.get("ETag")
+    _last_response["data"] = data
+    return data
+
+# The server sends a keep-alive comment every 15 s on an idle stream; a longer silence
+# means the connection is dead, so the read times out and the caller reconnects.
+STREAM_READ_TIMEOUT_SECONDS = 45
+
+def stream_latest_scorecards():
+    """Yield each scorecard batch pushed by the API's server-sent event stream."""
+    url = f"{API_BASE}/cds/scorecards/stream"
+    headers = {}
+    # event ids are the scorecards ETag; on reconnect the server skips the batch we already have
+    if _last_response["etag"] is not None:
+        headers["Last-Event-ID"] = _last_response["etag"]
+    with _SESSION.get(url, headers=headers, stream=True, timeout=(5, STREAM_READ_TIMEOUT_SECONDS)) as r:
+        r.raise_for_status()
+        event_id = None
+        data_lines = []
+        for line in r.iter_lines(decode_unicode=True):
+            if line.startswith("id: "):
+                event_id = line[len("id: "):]
+            elif line.startswith("data: "):
+                data_lines.append(line[len("data: "):])
+            elif not line and data_lines:
+                data = json.loads("\n".join(data_lines))
+                data_lines = []
+                if event_id is not None:
+                    _last_response["etag"] = event_id
+                _last_response["data"] = data
+                yield data
 
 def print_brief(items, max_items=3):
     print(f"Received {len(items)} scorecards. Showing up to {max_items}:")
@@ -21,9 +63,9 @@ def print_brief(items, max_items=3):
 if __name__ == "__main__":
     while True:
         try:
-            data = fetch_latest_scorecards()
-            items = data.get("items", [])
-            print_brief(items)
+            for data in stream_latest_scorecards():
+                print_brief(data.get("items", []))
         except Exception as e:
             print("Error fetching CDS data:", e)
+        # reconnect after the stream drops
         time.sleep(10)
@@ -1,12 +1,19 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
-import json
-import glob
+import asyncio
 import os
+import time
 
-app = FastAPI(title="Personalized Adaptive Hypothermia - CDS API", version="1.0.0")
+import orjson
+
+app = FastAPI(
+    title="Personalized Adaptive Hypothermia - CDS API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,30 +25,112 @@ app.add_middleware(
 
 OUTPUT_DIR = Path(__file__).resolve().parents[1] / "outputs" / "cds"
 
-def latest_scorecards_path():
-    pattern = str(OUTPUT_DIR / "cds_scorecards_*.json")
-    files = glob.glob(pattern)
-    if not files:
+# Upper bound on mock patients per POST /cds/refresh (the endpoint is unauthenticated)
+MAX_REFRESH_PATIENTS = 500
+
+# How often the scorecard stream checks for a newer file
+STREAM_POLL_SECONDS = 1.0
+# Idle streams get an SSE comment this often, so clients and proxies see the connection is alive
+STREAM_KEEPALIVE_SECONDS = 15.0
+
+# Bursts of requests within the same second share one directory scan
+LATEST_PATH_TTL_SECONDS = 1.0
+_latest_path_memo = {"bucket": None, "path": None}
+
+def _scan_latest_scorecards_path():
+    # filenames embed a sortable UTC timestamp, so the max name is the newest file
+    best = None
+    try:
+        with os.scandir(OUTPUT_DIR) as entries:
+            for entry in entries:
+                name = entry.name
+                if name.startswith("cds_scorecards_") and name.endswith(".json") and (best is None or name > best):
+                    best = name
+    except FileNotFoundError:
         return None
-    # sort by filename timestamp descending
-    files.sort(reverse=True)
-    return files[0]
+    return str(OUTPUT_DIR / best) if best else None
+
+def latest_scorecards_path():
+    bucket = int(time.monotonic() // LATEST_PATH_TTL_SECONDS)
+    if _latest_path_memo["bucket"] != bucket:
+        _latest_path_memo["path"] = _scan_latest_scorecards_path()
+        _latest_path_memo["bucket"] = bucket
+    return _latest_path_memo["path"]
+
+# In-memory copy of the latest scorecards file. Scorecard files are already
+# valid JSON, so the raw bytes are served as-is; the per-patient index holds
+# pre-serialized scorecards. The snapshot is replaced wholesale (never mutated)
+# whenever the latest path or its mtime changes, so concurrent readers always
+# see a consistent path/bytes/index triple.
+_cache = {"path": None, "mtime_ns": 0, "etag": None, "raw_bytes": b"", "by_pid": {}}
+
+def load_latest_scorecards(path):
+    global _cache
+    mtime_ns = os.stat(path).st_mtime_ns
+    cache = _cache
+    if cache["path"] == path and cache["mtime_ns"] == mtime_ns:
+        return cache
+    raw = Path(path).read_bytes()
+    by_pid = {}
+    for sc in orjson.loads(raw).get("items", []):
+        # keep the first match per patient, as the linear scan did
+        by_pid.setdefault(str(sc.get("patient_id")), orjson.dumps(sc))
+    # ETag changes whenever a new file is written, letting pollers skip unchanged payloads
+    etag = f'"{mtime_ns:x}-{len(raw):x}"'
+    cache = {"path": path, "mtime_ns": mtime_ns, "etag": etag, "raw_bytes": raw, "by_pid": by_pid}
+    _cache = cache
+    return cache
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
 @app.get("/cds/scorecards/latest")
-def get_latest_scorecards():
+def get_latest_scorecards(if_none_match: str | None = Header(default=None)):
     p = latest_scorecards_path()
     if p is None:
         raise HTTPException(status_code=404, detail="No CDS scorecards found")
     try:
-        with open(p, "r") as f:
-            data = json.load(f)
-        return JSONResponse(content=data)
+        cache = load_latest_scorecards(p)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read scorecards: {e}")
+    headers = {"ETag": cache["etag"]}
+    if if_none_match == cache["etag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=cache["raw_bytes"], media_type="application/json", headers=headers)
+
+def _sse_event(cache):
+    # multi-line JSON is split across data: lines; clients rejoin them with newlines
+    data = b"".join(b"data: " + line + b"\n" for line in cache["raw_bytes"].splitlines())
+    return b"id: " + cache["etag"].encode() + b"\n" + data + b"\n"
+
+@app.get("/cds/scorecards/stream")
+async def stream_scorecards(request: Request, last_event_id: str | None = Header(default=None)):
+    """Server-sent events: push the latest scorecards, then again only when the file changes.
+
+    Event ids are the scorecards ETag; a reconnecting client that sends Last-Event-ID
+    is not re-sent the batch it already has.
+    """
+    async def events():
+        last_etag = last_event_id
+        last_sent = time.monotonic()
+        while not await request.is_disconnected():
+            p = latest_scorecards_path()
+            if p is not None:
+                try:
+                    cache = await run_in_threadpool(load_latest_scorecards, p)
+                except Exception:
+                    cache = None
+                if cache is not None and cache["etag"] != last_etag:
+                    last_etag = cache["etag"]
+                    last_sent = time.monotonic()
+                    yield _sse_event(cache)
+            if time.monotonic() - last_sent >= STREAM_KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield b": keep-alive\n\n"
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 @app.get("/cds/scorecards/{filename}")
 def get_scorecards_by_filename(filename: str):
@@ -49,24 +138,30 @@ def get_scorecards_by_filename(filename: str):
     if not target.exists():
         raise HTTPException(status_code=404, detail="Requested file not found")
     try:
-        with open(target, "r") as f:
-            data = json.load(f)
-        return JSONResponse(content=data)
+        return orjson.loads(target.read_bytes())
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to read requested file: {e}")
 
+@app.post("/cds/refresh")
+def refresh_scorecards(patients: int = Query(5, ge=1, le=MAX_REFRESH_PATIENTS)):
+    """Rebuild scorecards with the models already loaded in this process and write a new batch."""
+    # imported lazily so the API starts without models; the first refresh loads them once
+    from mock_live_feed import make_mock_dataframe, run_cds, save_outputs
+    scorecards = run_cds(make_mock_dataframe(patients))
+    out_path = save_outputs(scorecards, out_dir=str(OUTPUT_DIR))
+    # force the next lookup to rescan so the new file is served immediately
+    _latest_path_memo["bucket"] = None
+    return {"file": Path(out_path).name, "count": len(scorecards)}
+
 @app.get("/cds/patient/{patient_id}")
 def get_patient_scorecard(patient_id: str):
     p = latest_scorecards_path()
     if p is None:
         raise HTTPException(status_code=404, detail="No CDS scorecards found")
-    with open(p, "r") as f:
-        data = json.load(f)
-    items = data.get("items", [])
-    matches = [sc for sc in items if str(sc.get("patient_id")) == str(patient_id)]
-    if not matches:
+    scorecard = load_latest_scorecards(p)["by_pid"].get(str(patient_id))
+    if scorecard is None:
         raise HTTPException(status_code=404, detail="Patient not found in latest scorecards")
-    return JSONResponse(content=matches[0])
+    return Response(content=scorecard, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
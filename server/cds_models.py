@@ -0,0 +1,93 @@
+"""
+Shared loader for the trained CDS models and their feature lists.
+
+The models are deserialized once per process and reused, so the API can rebuild
+scorecards (POST /cds/refresh) without reloading them from disk every cycle.
+"""
+
+import importlib
+import importlib.machinery
+import importlib.util
+import json
+import os
+import sys
+import threading
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+import joblib
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(ROOT, "models")
+
+# Models may be custom estimators from utils/model_utils.py (e.g. QuantizedForestRegressor).
+# Their canonical module is "utils.model_utils"; files pickled from a flat "model_utils"
+# import are mapped onto it while loading. sys.path is left alone, so each utils module
+# has exactly one import name in the server process.
+CANONICAL_MODEL_MODULE = "utils.model_utils"
+LEGACY_MODEL_MODULES = ("model_utils",)
+_LOAD_LOCK = threading.Lock()
+
+
+def _import_model_module():
+    if "utils" not in sys.modules:
+        # ROOT/utils has no __init__.py: import it as a namespace package from ROOT
+        spec = importlib.machinery.PathFinder.find_spec("utils", [ROOT])
+        sys.modules["utils"] = importlib.util.module_from_spec(spec)
+    return importlib.import_module(CANONICAL_MODEL_MODULE)
+
+
+class ModelBundle(NamedTuple):
+    temp_model: object
+    temp_features: List[str]
+    seizure_model: Optional[object]
+    sepsis_model: Optional[object]
+    cardiac_model: Optional[object]
+    renal_model: Optional[object]
+    prognosis_model: object
+    prognosis_features: List[str]
+
+
+def load_model(path: str):
+    module = _import_model_module()
+    # The legacy names only exist for the duration of the load
+    with _LOAD_LOCK:
+        aliased = [name for name in LEGACY_MODEL_MODULES if name not in sys.modules]
+        for name in aliased:
+            sys.modules[name] = module
+        try:
+            # Models are saved compressed (see utils/model_utils.save_models), which joblib cannot memory-map
+            return joblib.load(path)
+        finally:
+            for name in aliased:
+                del sys.modules[name]
+
+
+def safe_load(path: str):
+    try:
+        return load_model(path)
+    except Exception:
+        return None
+
+
+def _load_json(path: str):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=1)
+def load_models() -> ModelBundle:
+    """Load every CDS model once; later calls return the same bundle."""
+    return ModelBundle(
+        temp_model=load_model(os.path.join(MODELS_DIR, "temperature_optimization_model.pkl")),
+        temp_features=_load_json(os.path.join(MODELS_DIR, "temperature_model_features.json")),
+        seizure_model=safe_load(os.path.join(MODELS_DIR, "seizure_model_logreg.pkl")) or
+                      safe_load(os.path.join(MODELS_DIR, "seizure_model_rf.pkl")) or
+                      safe_load(os.path.join(MODELS_DIR, "seizure_model_gb.pkl")),
+        sepsis_model=safe_load(os.path.join(MODELS_DIR, "sepsis_model_rf.pkl")),
+        cardiac_model=safe_load(os.path.join(MODELS_DIR, "cardiac_model_rf.pkl")),
+        renal_model=safe_load(os.path.join(MODELS_DIR, "renal_model_rf.pkl")),
+        prognosis_model=load_model(os.path.join(MODELS_DIR, "prognosis_model_logreg.pkl")),
+        prognosis_features=_load_json(os.path.join(MODELS_DIR, "prognosis_feature_columns.json")),
+    )
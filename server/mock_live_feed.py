@@ -8,45 +8,57 @@ The resulting JSON is written to outputs/cds/, and the API will serve the newest
 """
 
 import argparse
-import json
 import os
-import pickle
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
 
 import numpy as np
+import orjson
 import pandas as pd
 
-
-# --- Load models and feature lists ---
-ROOT = os.path.dirname(os.path.dirname(__file__))
-MODELS_DIR = os.path.join(ROOT, "models")
+from cds_models import ROOT, load_models
+
+
+# --- Load models and feature lists (once per process, shared with the API) ---
+_models = load_models()
+temp_model = _models.temp_model
+temp_features: List[str] = _models.temp_features
+seizure_model = _models.seizure_model
+sepsis_model = _models.sepsis_model
+cardiac_model = _models.cardiac_model
+renal_model = _models.renal_model
+prognosis_model = _models.prognosis_model
+prognosis_features: List[str] = _models.prognosis_features
+
+# Event models all score the prognosis feature matrix
+EVENT_MODELS = {
+    "seizure": seizure_model,
+    "sepsis": sepsis_model,
+    "cardiac": cardiac_model,
+    "renal": renal_model,
+    "prognosis_poor_outcome": prognosis_model,
+}
 
 
-def safe_load(path: str):
+def warm_models():
+    """Run one throwaway prediction per model so the first real batch skips lazy setup."""
     try:
-        with open(path, "rb") as f:
-            return pickle.load(f)
+        temp_model.predict(np.zeros((1, len(temp_features)), dtype=np.float32))
     except Exception:
-        return None
-
+        pass
+    X_warm = np.zeros((1, len(prognosis_features)), dtype=np.float32)
+    for model in EVENT_MODELS.values():
+        if model is not None:
+            try:
+                model.predict_proba(X_warm)
+            except Exception:
+                pass
 
-with open(os.path.join(MODELS_DIR, "temperature_optimization_model.pkl"), "rb") as f:
-    temp_model = pickle.load(f)
-with open(os.path.join(MODELS_DIR, "temperature_model_features.json"), "r") as f:
-    temp_features: List[str] = json.load(f)
 
-seizure_model = safe_load(os.path.join(MODELS_DIR, "seizure_model_logreg.pkl")) or \
-                safe_load(os.path.join(MODELS_DIR, "seizure_model_rf.pkl")) or \
-                safe_load(os.path.join(MODELS_DIR, "seizure_model_gb.pkl"))
-sepsis_model = safe_load(os.path.join(MODELS_DIR, "sepsis_model_rf.pkl"))
-cardiac_model = safe_load(os.path.join(MODELS_DIR, "cardiac_model_rf.pkl"))
-renal_model = safe_load(os.path.join(MODELS_DIR, "renal_model_rf.pkl"))
-
-with open(os.path.join(MODELS_DIR, "prognosis_model_logreg.pkl"), "rb") as f:
-    prognosis_model = pickle.load(f)
-with open(os.path.join(MODELS_DIR, "prognosis_feature_columns.json"), "r") as f:
-    prognosis_features: List[str] = json.load(f)
+warm_models()
 
 
 # --- Config ---
@@ -60,124 +72,193 @@ CDS_CONFIG = {
 }
 
 RISK_LABELS = {"high": "HIGH", "medium": "MED", "low": "LOW"}
+# Indexed by the number of thresholds a probability clears (0, 1 or 2)
+RISK_LEVELS_BY_RANK = np.array([RISK_LABELS["low"], RISK_LABELS["medium"], RISK_LABELS["high"]], dtype=object)
+
+# (risk name, probability key, high threshold, medium threshold)
+RISK_THRESHOLDS = [
+    ("seizure", "seizure", CDS_CONFIG["seizure"]["high"], CDS_CONFIG["seizure"]["medium"]),
+    ("sepsis", "sepsis", CDS_CONFIG["sepsis"]["high"], CDS_CONFIG["sepsis"]["medium"]),
+    ("cardiac", "cardiac", CDS_CONFIG["cardiac"]["high"], CDS_CONFIG["cardiac"]["medium"]),
+    ("renal", "renal", CDS_CONFIG["renal"]["high"], CDS_CONFIG["renal"]["medium"]),
+    ("prognosis", "prognosis_poor_outcome", CDS_CONFIG["prognosis"]["poor_outcome_prob_high"], CDS_CONFIG["prognosis"]["poor_outcome_prob_medium"]),
+]
+
+RECS = {
+    "seizure": {
+        "HIGH": "Initiate continuous EEG; review antiseizure therapy.",
+        "MED": "Increase neuro checks frequency; consider EEG if symptomatic.",
+    },
+    "sepsis": {
+        "HIGH": "Sepsis bundle: cultures, antibiotics, fluids per protocol.",
+        "MED": "Trend lactate; monitor vitals and labs closely.",
+    },
+    "cardiac": {
+        "HIGH": "Cardiac consult; optimize MAP and rhythm management.",
+        "MED": "Increase telemetry vigilance; review medications impacting QT/MAP.",
+    },
+    "renal": {
+        "HIGH": "Renal consult; adjust nephrotoxic meds; optimize fluids.",
+        "MED": "Monitor urine output and creatinine; adjust dosing.",
+    },
+    "prognosis": {
+        "HIGH": "Discuss goals of care; consider advanced monitoring/support.",
+        "MED": "Ensure multidisciplinary review; reassess trajectory in 12h.",
+    },
+}
 
-
-# --- Helpers ---
-def categorize(prob: float, high: float, medium: float) -> str:
-    if prob >= high:
-        return RISK_LABELS["high"]
-    if prob >= medium:
-        return RISK_LABELS["medium"]
-    return RISK_LABELS["low"]
+# Checked in order; the final entry always matches
+TEMP_RECS = [
+    (CDS_CONFIG["temperature_adjustment_degC"]["max"], "Strongly consider temperature reduction by ~1.0°C."),
+    (CDS_CONFIG["temperature_adjustment_degC"]["medium"], "Consider temperature reduction by ~0.5°C."),
+    (float("-inf"), "Maintain current temperature; continue monitoring."),
+]
 
 
-def compute_temp_adjustment(row: pd.Series) -> float:
+# --- Helpers ---
+def categorize(probs: np.ndarray, high: float, medium: float) -> np.ndarray:
+    """Map a vector of probabilities to risk labels without per-element branching."""
+    rank = (probs >= medium).astype(np.int8) + (probs >= high).astype(np.int8)
+    return RISK_LEVELS_BY_RANK[rank]
+
+
+def predict_rows(predict, X: np.ndarray) -> np.ndarray:
+    """
+    Score all rows in one call; if that raises, isolate the failing rows so one bad
+    patient (e.g. a NaN feature) does not blank out the whole cohort. Rows that still
+    fail come back as NaN.
+    """
     try:
-        delta = float(temp_model.predict(row[temp_features].values.reshape(1, -1))[0])
+        return np.asarray(predict(X), dtype=float)
     except Exception:
-        delta = 0.0
-    return max(0.0, delta)
-
-
-def compute_event_probability(model, row: pd.Series, cols: List[str]):
+        pass
+    out = np.full(len(X), np.nan)
+    finite = np.isfinite(X).all(axis=1)
+    retry_rows = np.flatnonzero(~finite)
+    if finite.any():
+        try:
+            out[finite] = predict(X[finite])
+        except Exception:
+            retry_rows = np.arange(len(X))
+    for i in retry_rows:
+        try:
+            out[i] = predict(X[i:i + 1])[0]
+        except Exception:
+            pass
+    return out
+
+
+def compute_temp_adjustments(X_temp: np.ndarray) -> np.ndarray:
+    # a patient whose prediction failed gets no adjustment
+    deltas = predict_rows(temp_model.predict, X_temp)
+    return np.maximum(np.nan_to_num(deltas, nan=0.0), 0.0)
+
+
+def compute_event_probabilities(model, X: np.ndarray):
+    """Positive-class probabilities, NaN where a patient could not be scored; None without a model."""
     if model is None:
         return None
-    try:
-        prob = float(model.predict_proba(row[cols].values.reshape(1, -1))[0, 1])
-        return prob
-    except Exception:
-        return None
+    return predict_rows(lambda rows: model.predict_proba(rows)[:, 1], X)
+
+
+def temperature_rank(temp_deltas: np.ndarray) -> np.ndarray:
+    """Index of the first TEMP_RECS entry each delta satisfies."""
+    rank = np.zeros(len(temp_deltas), dtype=np.int8)
+    for threshold, _ in TEMP_RECS[:-1]:
+        rank += temp_deltas < threshold
+    return rank
 
 
-def build_scorecard(patient_id: str, row: pd.Series) -> dict:
-    temp_delta = compute_temp_adjustment(row)
-
-    seizure_prob = compute_event_probability(seizure_model, row, prognosis_features)
-    sepsis_prob = compute_event_probability(sepsis_model, row, prognosis_features)
-    cardiac_prob = compute_event_probability(cardiac_model, row, prognosis_features)
-    renal_prob = compute_event_probability(renal_model, row, prognosis_features)
-    prognosis_prob = compute_event_probability(prognosis_model, row, prognosis_features)
-
-    risks = {
-        "seizure": categorize(seizure_prob or 0.0, CDS_CONFIG["seizure"]["high"], CDS_CONFIG["seizure"]["medium"]),
-        "sepsis": categorize(sepsis_prob or 0.0, CDS_CONFIG["sepsis"]["high"], CDS_CONFIG["sepsis"]["medium"]),
-        "cardiac": categorize(cardiac_prob or 0.0, CDS_CONFIG["cardiac"]["high"], CDS_CONFIG["cardiac"]["medium"]),
-        "renal": categorize(renal_prob or 0.0, CDS_CONFIG["renal"]["high"], CDS_CONFIG["renal"]["medium"]),
-        "prognosis": categorize(prognosis_prob or 0.0, CDS_CONFIG["prognosis"]["poor_outcome_prob_high"], CDS_CONFIG["prognosis"]["poor_outcome_prob_medium"]),
-    }
-
-    recommendations = []
-    if risks["seizure"] == "HIGH":
-        recommendations.append("Initiate continuous EEG; review antiseizure therapy.")
-    elif risks["seizure"] == "MED":
-        recommendations.append("Increase neuro checks frequency; consider EEG if symptomatic.")
-
-    if risks["sepsis"] == "HIGH":
-        recommendations.append("Sepsis bundle: cultures, antibiotics, fluids per protocol.")
-    elif risks["sepsis"] == "MED":
-        recommendations.append("Trend lactate; monitor vitals and labs closely.")
-
-    if risks["cardiac"] == "HIGH":
-        recommendations.append("Cardiac consult; optimize MAP and rhythm management.")
-    elif risks["cardiac"] == "MED":
-        recommendations.append("Increase telemetry vigilance; review medications impacting QT/MAP.")
-
-    if risks["renal"] == "HIGH":
-        recommendations.append("Renal consult; adjust nephrotoxic meds; optimize fluids.")
-    elif risks["renal"] == "MED":
-        recommendations.append("Monitor urine output and creatinine; adjust dosing.")
-
-    if risks["prognosis"] == "HIGH":
-        recommendations.append("Discuss goals of care; consider advanced monitoring/support.")
-    elif risks["prognosis"] == "MED":
-        recommendations.append("Ensure multidisciplinary review; reassess trajectory in 12h.")
-
-    if temp_delta >= CDS_CONFIG["temperature_adjustment_degC"]["max"]:
-        recommendations.append("Strongly consider temperature reduction by ~1.0°C.")
-    elif temp_delta >= CDS_CONFIG["temperature_adjustment_degC"]["medium"]:
-        recommendations.append("Consider temperature reduction by ~0.5°C.")
-    else:
-        recommendations.append("Maintain current temperature; continue monitoring.")
-
-    return {
-        "patient_id": patient_id,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
-        "probabilities": {
-            "seizure": seizure_prob,
-            "sepsis": sepsis_prob,
-            "cardiac": cardiac_prob,
-            "renal": renal_prob,
-            "prognosis_poor_outcome": prognosis_prob,
-        },
-        "risk_levels": risks,
-        "temperature_adjustment_degC": round(temp_delta, 2),
-        "recommendations": recommendations,
-    }
+@lru_cache(maxsize=None)
+def recommendations_for(risk_levels: Tuple[str, ...], temp_rank: int) -> Tuple[str, ...]:
+    """
+    Recommendations for one combination of risk levels (in RISK_THRESHOLDS
+    order) and temperature bucket. There are only 3^5 * 3 combinations, so
+    after warm-up every patient is a cache hit.
+    """
+    recommendations = [
+        RECS[risk_name][level]
+        for (risk_name, *_), level in zip(RISK_THRESHOLDS, risk_levels)
+        if level in RECS[risk_name]
+    ]
+    recommendations.append(TEMP_RECS[temp_rank][1])
+    return tuple(recommendations)
 
 
 def run_cds(df: pd.DataFrame, id_col: str = "patient_id"):
-    return [build_scorecard(str(row[id_col]), row) for _, row in df.iterrows()]
+    # One predict call per model over all patients; the per-patient loop only assembles dicts
+    # float32 C-contiguous inputs: tree models predict on float32 natively, so
+    # this skips their internal copy and halves the bytes fed to every model
+    X_prog = np.ascontiguousarray(df[prognosis_features].to_numpy(dtype=np.float32))
+    X_temp = np.ascontiguousarray(df[temp_features].to_numpy(dtype=np.float32))
+
+    # sklearn releases the GIL inside tree/BLAS prediction, so the models run concurrently
+    with ThreadPoolExecutor(max_workers=len(EVENT_MODELS) + 1) as executor:
+        temp_future = executor.submit(compute_temp_adjustments, X_temp)
+        prob_futures = {
+            name: executor.submit(compute_event_probabilities, model, X_prog)
+            for name, model in EVENT_MODELS.items()
+        }
+        temp_deltas = temp_future.result()
+        all_probs = {name: future.result() for name, future in prob_futures.items()}
+
+    n_patients = len(df)
+    event_probs = {}
+    risk_levels = {}
+    for risk_name, prob_key, high, medium in RISK_THRESHOLDS:
+        probs = all_probs[prob_key]
+        if probs is None:
+            # a missing model reports no probability and is scored as LOW risk
+            event_probs[prob_key] = [None] * n_patients
+            probs = np.zeros(n_patients)
+        else:
+            # patients the model could not score report None and count as LOW, as above
+            scored = ~np.isnan(probs)
+            event_probs[prob_key] = [p if ok else None for p, ok in zip(probs.tolist(), scored.tolist())]
+            probs = np.where(scored, probs, 0.0)
+        risk_levels[risk_name] = categorize(probs, high, medium).tolist()
+
+    patient_ids = df[id_col].astype(str).tolist()
+    timestamp = datetime.utcnow().isoformat() + "Z"
+    temp_adjustments = np.round(temp_deltas, 2).tolist()
+    temp_ranks = temperature_rank(temp_deltas).tolist()
+    prob_columns = list(event_probs.values())
+
+    scorecards = []
+    for i, levels in enumerate(zip(*risk_levels.values())):
+        scorecards.append({
+            "patient_id": patient_ids[i],
+            "timestamp": timestamp,
+            "probabilities": dict(zip(event_probs, (column[i] for column in prob_columns))),
+            "risk_levels": dict(zip(risk_levels, levels)),
+            "temperature_adjustment_degC": temp_adjustments[i],
+            "recommendations": list(recommendations_for(levels, temp_ranks[i])),
+        })
+    return scorecards
 
 
 def save_outputs(scorecards, out_dir=os.path.join(ROOT, "outputs", "cds")):
     os.makedirs(out_dir, exist_ok=True)
     ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
     out_path = os.path.join(out_dir, f"cds_scorecards_{ts}.json")
-    with open(out_path, "w") as f:
-        json.dump({"generated_at": ts, "items": scorecards}, f, indent=2)
+    Path(out_path).write_bytes(orjson.dumps(
+        {"generated_at": ts, "items": scorecards},
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+    ))
     print(f"Saved {len(scorecards)} scorecards to {out_path}")
     return out_path
 
 
-def make_mock_dataframe(n_patients: int) -> pd.DataFrame:
-    np.random.seed(int(datetime.utcnow().timestamp()) % 1_000_000)
-    data = {c: np.random.normal(0, 1, size=n_patients) for c in prognosis_features}
+def make_mock_dataframe(n_patients: int, rng: np.random.Generator | None = None) -> pd.DataFrame:
+    if rng is None:
+        rng = np.random.default_rng()
+    data = {c: rng.normal(0, 1, size=n_patients) for c in prognosis_features}
     data["patient_id"] = [f"LIVE-{i+1:03d}" for i in range(n_patients)]
 
     # Add minimal temp feature columns if they exist
     for col in temp_features:
         if col not in data:
-            data[col] = np.random.normal(0, 1, size=n_patients)
+            data[col] = rng.normal(0, 1, size=n_patients)
 
     return pd.DataFrame(data)
 
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.base import is_regressor
+from sklearn.ensemble import RandomForestRegressor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.model_utils import QuantizedForestRegressor  # noqa: E402
+
+
+def _fit_forest(X, y):
+    return RandomForestRegressor(n_estimators=20, max_depth=8, random_state=0).fit(X, y)
+
+
+def test_quantized_forest_matches_sklearn_with_nan_inputs():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(2000, 6))
+    y = 33.5 + 0.8 * np.tanh(X[:, 0]) + 0.3 * X[:, 1] + rng.normal(0, 0.1, len(X))
+    forest = _fit_forest(X, y)
+    quantized = QuantizedForestRegressor(forest)
+
+    X_eval = rng.normal(size=(500, 6))
+    X_eval[rng.random(X_eval.shape) < 0.2] = np.nan
+    X_eval[:5, :] = np.nan
+
+    # Per tree the quantization error is at most half a step of that tree's leaf range
+    leaf_range = y.max() - y.min()
+    np.testing.assert_allclose(quantized.predict(X_eval), forest.predict(X_eval), atol=leaf_range / 510)
+
+
+def test_quantized_forest_follows_missing_values_seen_in_training():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(2000, 4))
+    X[rng.random(len(X)) < 0.3, 0] = np.nan
+    # Missing values carry their own target, so the splits learn where NaN should go
+    y = np.where(np.isnan(X[:, 0]), 10.0, X[:, 0])
+    forest = _fit_forest(X, y)
+    quantized = QuantizedForestRegressor(forest)
+
+    X_eval = rng.normal(size=(200, 4))
+    X_eval[::2, 0] = np.nan
+    np.testing.assert_allclose(quantized.predict(X_eval), forest.predict(X_eval), atol=(y.max() - y.min()) / 510)
+
+
+def test_quantized_forest_rejects_mis_shaped_input():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(300, 5))
+    y = X[:, 0] + rng.normal(0, 0.1, len(X))
+    quantized = QuantizedForestRegressor(_fit_forest(X, y))
+
+    with pytest.raises(ValueError, match="expecting 5 features"):
+        quantized.predict(X[:, :3])
+    with pytest.raises(ValueError, match="Expected 2D array"):
+        quantized.predict(X[0])
+    assert is_regressor(quantized)
+    assert quantized.score(X, y) > 0.9
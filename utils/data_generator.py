@@ -8,13 +8,87 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, Tuple, List
 
+from numba import njit
+
+
+# Seizure onsets depend on whether a seizure is already running, so the mask
+# is built in a small compiled loop over pre-drawn uniforms; all EEG band
+# powers are then drawn in bulk and selected with the mask. No on-disk cache:
+# numba keys it to the importing module name, and this module is imported both
+# as utils.data_generator and (from the notebooks) as plain data_generator.
+
+@njit
+def _build_seizure_mask(onset_draws, onset_probability, time_points, seizure_duration, seizure_start_minute):
+    mask = np.zeros(time_points.shape[0], dtype=np.bool_)
+    # A negative start minute means no seizure is pending
+    for i in range(time_points.shape[0]):
+        current_minute = time_points[i] / 60
+
+        # Check for seizure onset
+        if seizure_start_minute < 0 and onset_draws[i] < onset_probability:
+            seizure_start_minute = current_minute
+
+        if seizure_start_minute >= 0:
+            if current_minute < seizure_start_minute + seizure_duration:
+                mask[i] = True
+            else:
+                seizure_start_minute = -1.0
+    return mask
+
+
+HIE_SEVERITIES = ['mild', 'moderate', 'severe']
+
+# Cooling protocol per HIE severity: (low, high) ranges are sampled uniformly
+COOLING_PROTOCOL_RANGES = {
+    'mild': {
+        'target_temp': (32.5, 33.5),  # °C
+        'duration_hours': 48,
+        'cooling_rate': (0.1, 0.2),  # °C/hour
+        'rewarming_rate': (0.05, 0.1),  # °C/hour
+    },
+    'moderate': {
+        'target_temp': (33.0, 33.5),  # °C
+        'duration_hours': 72,
+        'cooling_rate': (0.15, 0.25),  # °C/hour
+        'rewarming_rate': (0.05, 0.1),  # °C/hour
+    },
+    'severe': {
+        'target_temp': (32.0, 33.5),  # °C
+        'duration_hours': 72,
+        'cooling_rate': (0.2, 0.3),  # °C/hour
+        'rewarming_rate': (0.05, 0.08),  # °C/hour
+    },
+}
+
+# Arterial blood gas baselines per HIE severity
+BLOOD_GAS_BASELINES = {
+    'mild': {'pH': 7.35, 'pCO2': 45, 'pO2': 85, 'lactate': 2},
+    'moderate': {'pH': 7.30, 'pCO2': 48, 'pO2': 75, 'lactate': 4},
+    'severe': {'pH': 7.25, 'pCO2': 50, 'pO2': 65, 'lactate': 8},
+}
+
+# Float columns that vary over time, stored together in the batch buffer
+TIME_SERIES_COLUMNS = [
+    'time_hours',
+    'rectal_temperature_c',
+    'heart_rate_bpm',
+    'systolic_bp_mmhg',
+    'diastolic_bp_mmhg',
+    'oxygen_saturation_percent',
+    'target_temp_c',
+    'pH',
+    'pCO2_mmhg',
+    'pO2_mmhg',
+    'lactate_mmol',
+]
+
 
 class InfantPhysiologicalDataGenerator:
     """Generates realistic mocked physiological data for infants with HIE (Hypoxic-Ischemic Encephalopathy)"""
     
     def __init__(self, seed: int = 42):
         """Initialize the data generator with optional random seed for reproducibility"""
-        np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
         self.seed = seed
     
     def generate_baseline_parameters(self, patient_id: str) -> Dict:
@@ -23,59 +97,76 @@ class InfantPhysiologicalDataGenerator:
         # Baseline values for newborns with HIE (typically 3-5 kg, 48-55 cm)
         baseline = {
             'patient_id': patient_id,
-            'birth_weight_kg': np.random.uniform(2.5, 4.5),
-            'gestational_age_weeks': np.random.uniform(35, 42),
-            'birth_hour': np.random.randint(0, 24),
-            'hie_severity': np.random.choice(['mild', 'moderate', 'severe']),  # HIE classification
+            'birth_weight_kg': self.rng.uniform(2.5, 4.5),
+            'gestational_age_weeks': self.rng.uniform(35, 42),
+            'birth_hour': self.rng.integers(0, 24),
+            'hie_severity': self.rng.choice(['mild', 'moderate', 'severe']),  # HIE classification
             
             # Baseline vitals (normal newborn ranges)
-            'baseline_heart_rate': np.random.uniform(120, 160),  # bpm
-            'baseline_resp_rate': np.random.uniform(40, 60),  # breaths/min
-            'baseline_systolic_bp': np.random.uniform(50, 70),  # mmHg
-            'baseline_diastolic_bp': np.random.uniform(30, 45),  # mmHg
-            'baseline_oxygen_sat': np.random.uniform(95, 100),  # %
+            'baseline_heart_rate': self.rng.uniform(120, 160),  # bpm
+            'baseline_resp_rate': self.rng.uniform(40, 60),  # breaths/min
+            'baseline_systolic_bp': self.rng.uniform(50, 70),  # mmHg
+            'baseline_diastolic_bp': self.rng.uniform(30, 45),  # mmHg
+            'baseline_oxygen_sat': self.rng.uniform(95, 100),  # %
             
             # Rectal temperature baseline (normal newborn: 36.5-37.5°C)
-            'baseline_rectal_temp': np.random.uniform(36.8, 37.4),  # °C
-            'baseline_core_temp': np.random.uniform(36.5, 37.3),  # °C
+            'baseline_rectal_temp': self.rng.uniform(36.8, 37.4),  # °C
+            'baseline_core_temp': self.rng.uniform(36.5, 37.3),  # °C
             
             # Seizure susceptibility (depends on HIE severity)
             'seizure_risk_factor': {'mild': 0.1, 'moderate': 0.4, 'severe': 0.7}[
-                np.random.choice(['mild', 'moderate', 'severe'])
+                self.rng.choice(['mild', 'moderate', 'severe'])
             ],
         }
         return baseline
     
+    def generate_baseline_parameter_arrays(self, num_patients: int) -> Dict[str, np.ndarray]:
+        """
+        Vectorized counterpart of generate_baseline_parameters: one array of
+        length num_patients per parameter (patient_id excluded)
+        """
+        
+        return {
+            'birth_weight_kg': self.rng.uniform(2.5, 4.5, num_patients),
+            'gestational_age_weeks': self.rng.uniform(35, 42, num_patients),
+            'birth_hour': self.rng.integers(0, 24, num_patients),
+            'hie_severity': self.rng.choice(HIE_SEVERITIES, num_patients).astype(object),
+            'baseline_heart_rate': self.rng.uniform(120, 160, num_patients),
+            'baseline_resp_rate': self.rng.uniform(40, 60, num_patients),
+            'baseline_systolic_bp': self.rng.uniform(50, 70, num_patients),
+            'baseline_diastolic_bp': self.rng.uniform(30, 45, num_patients),
+            'baseline_oxygen_sat': self.rng.uniform(95, 100, num_patients),
+            'baseline_rectal_temp': self.rng.uniform(36.8, 37.4, num_patients),
+            'baseline_core_temp': self.rng.uniform(36.5, 37.3, num_patients),
+            'seizure_risk_factor': np.array([0.1, 0.4, 0.7])[self.rng.integers(0, 3, num_patients)],
+        }
+    
     def generate_cooling_protocol(self, hie_severity: str, baseline_temp: float) -> Dict:
         """Generate individualized cooling protocol based on HIE severity"""
         
-        protocols = {
-            'mild': {
-                'target_temp': np.random.uniform(32.5, 33.5),  # °C
-                'duration_hours': 48,
-                'cooling_rate': np.random.uniform(0.1, 0.2),  # °C/hour
-                'rewarming_rate': np.random.uniform(0.05, 0.1),  # °C/hour
-            },
-            'moderate': {
-                'target_temp': np.random.uniform(33.0, 33.5),  # °C
-                'duration_hours': 72,
-                'cooling_rate': np.random.uniform(0.15, 0.25),  # °C/hour
-                'rewarming_rate': np.random.uniform(0.05, 0.1),  # °C/hour
-            },
-            'severe': {
-                'target_temp': np.random.uniform(32.0, 33.5),  # °C
-                'duration_hours': 72,
-                'cooling_rate': np.random.uniform(0.2, 0.3),  # °C/hour
-                'rewarming_rate': np.random.uniform(0.05, 0.08),  # °C/hour
-            },
+        ranges = COOLING_PROTOCOL_RANGES[hie_severity]
+        protocol = {
+            'target_temp': self.rng.uniform(*ranges['target_temp']),
+            'duration_hours': ranges['duration_hours'],
+            'cooling_rate': self.rng.uniform(*ranges['cooling_rate']),
+            'rewarming_rate': self.rng.uniform(*ranges['rewarming_rate']),
         }
-        
-        protocol = protocols[hie_severity]
         protocol['baseline_temp'] = baseline_temp
         protocol['start_time'] = datetime.now()
         
         return protocol
     
+    def generate_cooling_protocol_arrays(self, hie_severity: np.ndarray) -> Dict[str, np.ndarray]:
+        """Vectorized cooling protocol draws, one entry per patient severity"""
+        
+        ranges = [COOLING_PROTOCOL_RANGES[severity] for severity in hie_severity]
+        protocol = {}
+        for key in ('target_temp', 'cooling_rate', 'rewarming_rate'):
+            low = np.array([r[key][0] for r in ranges])
+            high = np.array([r[key][1] for r in ranges])
+            protocol[key] = self.rng.uniform(low, high)
+        return protocol
+    
     def simulate_rectal_temperature(
         self,
         baseline_temp: float,
@@ -96,34 +187,32 @@ class InfantPhysiologicalDataGenerator:
             duration_minutes: Total duration
             time_step: Time interval for measurements (minutes)
         
+        Temperatures and rates may also be column vectors of shape
+        (num_patients, 1) to simulate a whole cohort in one call.
+        
         Returns:
             time_points: Array of time points
             temperatures: Array of temperatures at each time point
+                (num_patients x time points for column-vector inputs)
         """
         
-        num_points = duration_minutes // time_step
         time_points = np.arange(0, duration_minutes, time_step)
-        temperatures = np.zeros(len(time_points))
+        shape = np.broadcast_shapes(np.shape(baseline_temp), np.shape(target_temp), np.shape(cooling_rate), time_points.shape)
         
         # Phase 1: Cooling
-        cooling_phase_minutes = abs(baseline_temp - target_temp) / (cooling_rate / 60)
-        cooling_phase_steps = int(cooling_phase_minutes / time_step)
-        
-        current_temp = baseline_temp
+        cooling_phase_minutes = np.abs(baseline_temp - target_temp) / (cooling_rate / 60)
+        cooling_phase_steps = np.asarray(cooling_phase_minutes / time_step).astype(int)
+        
+        # Cooling phase with slight variability (±0.1°C), then maintenance
+        # phase holding target ±0.3°C
+        temperatures = np.where(
+            np.arange(len(time_points)) < cooling_phase_steps,
+            baseline_temp - (cooling_rate / 60) * time_points + self.rng.normal(0, 0.05, shape),
+            target_temp + self.rng.normal(0, 0.15, shape),
+        )
         
-        for i in range(len(time_points)):
-            if i < cooling_phase_steps:
-                # Cooling phase with slight overshoot
-                current_temp = baseline_temp - (cooling_rate / 60 * time_points[i])
-                # Add slight variability (±0.1°C)
-                current_temp += np.random.normal(0, 0.05)
-            else:
-                # Maintenance phase - maintain target ±0.3°C
-                current_temp = target_temp + np.random.normal(0, 0.15)
-            
-            # Ensure realistic bounds
-            current_temp = np.clip(current_temp, target_temp - 0.5, baseline_temp + 0.5)
-            temperatures[i] = current_temp
+        # Ensure realistic bounds
+        np.clip(temperatures, target_temp - 0.5, baseline_temp + 0.5, out=temperatures)
         
         return time_points, temperatures
     
@@ -137,25 +226,22 @@ class InfantPhysiologicalDataGenerator:
         """
         Simulate heart rate variations during hypothermia
         Hypothermia typically causes bradycardia (lower HR)
+        baseline_hr may be a (num_patients, 1) column vector
         """
         
-        num_points = duration_minutes // time_step
         time_points = np.arange(0, duration_minutes, time_step)
-        heart_rates = np.zeros(len(time_points))
+        steps = np.arange(len(time_points))
+        shape = np.broadcast_shapes(np.shape(baseline_hr), time_points.shape)
         
         # During hypothermia, HR typically decreases by 10-20%
-        hypothermia_effect = np.random.uniform(0.85, 0.95)
+        base_hr = baseline_hr * self.rng.uniform(0.85, 0.95, np.shape(baseline_hr))
         
-        for i in range(len(time_points)):
-            # Base HR reduction during cooling
-            base_hr = baseline_hr * hypothermia_effect
-            
-            # Add variability and stress factors
-            noise = np.random.normal(0, 5)  # ±5 bpm variability
-            stress_component = stress_level * np.sin(2 * np.pi * i / (60 * 60 / time_step))  # Cyclic stress
-            
-            hr = base_hr + noise + stress_component
-            heart_rates[i] = np.clip(hr, 80, 180)  # Realistic bounds for newborn
+        # Add variability (±5 bpm) and cyclic stress
+        noise = self.rng.normal(0, 5, shape)
+        stress_component = stress_level * np.sin(2 * np.pi * steps / (60 * 60 / time_step))
+        
+        heart_rates = base_hr + noise + stress_component
+        np.clip(heart_rates, 80, 180, out=heart_rates)  # Realistic bounds for newborn
         
         return time_points, heart_rates
     
@@ -169,22 +255,22 @@ class InfantPhysiologicalDataGenerator:
         """
         Simulate systolic and diastolic blood pressure during hypothermia
         Hypothermia can cause initial hypertension, then hypotension
+        Baselines may be (num_patients, 1) column vectors
         """
         
-        num_points = duration_minutes // time_step
         time_points = np.arange(0, duration_minutes, time_step)
-        systolic_bp = np.zeros(len(time_points))
-        diastolic_bp = np.zeros(len(time_points))
+        steps = np.arange(len(time_points))
         
-        for i in range(len(time_points)):
-            # BP trend: slight decrease during cooling
-            trend = 0.95 + 0.1 * np.sin(2 * np.pi * i / (120 * 60 / time_step))
-            
-            sys_bp = baseline_systolic * trend + np.random.normal(0, 3)
-            dia_bp = baseline_diastolic * trend + np.random.normal(0, 2)
-            
-            systolic_bp[i] = np.clip(sys_bp, 40, 80)
-            diastolic_bp[i] = np.clip(dia_bp, 20, 50)
+        # BP trend: slight decrease during cooling
+        trend = 0.95 + 0.1 * np.sin(2 * np.pi * steps / (120 * 60 / time_step))
+        
+        systolic_bp = baseline_systolic * trend
+        systolic_bp = systolic_bp + self.rng.normal(0, 3, systolic_bp.shape)
+        diastolic_bp = baseline_diastolic * trend
+        diastolic_bp = diastolic_bp + self.rng.normal(0, 2, diastolic_bp.shape)
+        
+        np.clip(systolic_bp, 40, 80, out=systolic_bp)
+        np.clip(diastolic_bp, 20, 50, out=diastolic_bp)
         
         return time_points, systolic_bp, diastolic_bp
     
@@ -197,23 +283,23 @@ class InfantPhysiologicalDataGenerator:
     ) -> Tuple[np.ndarray, np.ndarray]:
         """
         Simulate oxygen saturation (SpO2) during therapeutic hypothermia
+        baseline_spo2 and respiratory_distress may be (num_patients, 1) column vectors
         """
         
-        num_points = duration_minutes // time_step
         time_points = np.arange(0, duration_minutes, time_step)
-        spo2_values = np.zeros(len(time_points))
+        steps = np.arange(len(time_points))
+        shape = np.broadcast_shapes(np.shape(baseline_spo2), np.shape(respiratory_distress), time_points.shape)
         
-        for i in range(len(time_points)):
-            base_spo2 = baseline_spo2
-            
-            if respiratory_distress:
-                # Add dips in SpO2 (15-30 min intervals)
-                if (i % (20 * 60 / time_step) < 10 * 60 / time_step):
-                    base_spo2 -= np.random.uniform(2, 5)
-            
-            # Normal variability
-            spo2 = base_spo2 + np.random.normal(0, 0.5)
-            spo2_values[i] = np.clip(spo2, 92, 100)
+        # Normal variability
+        spo2_values = baseline_spo2 + self.rng.normal(0, 0.5, shape)
+        
+        # Add dips in SpO2 (15-30 min intervals) under respiratory distress
+        dips = (steps % (20 * 60 / time_step) < 10 * 60 / time_step) & np.asarray(respiratory_distress, dtype=bool)
+        dips = np.broadcast_to(dips, shape)
+        if dips.any():
+            spo2_values[dips] -= self.rng.uniform(2, 5, int(dips.sum()))
+        
+        np.clip(spo2_values, 92, 100, out=spo2_values)
         
         return time_points, spo2_values
     
@@ -229,41 +315,22 @@ class InfantPhysiologicalDataGenerator:
         Returns power in each band (in microvolts^2)
         """
         
-        num_points = duration_minutes * 60 // time_step  # Convert to seconds
-        time_points = np.arange(0, duration_minutes * 60, time_step)
+        time_points = np.arange(0, duration_minutes * 60, time_step)  # Seconds
+        num_points = len(time_points)
         
-        # EEG frequency bands (simplified)
-        delta_power = np.zeros(len(time_points))  # 0.5-4 Hz
-        theta_power = np.zeros(len(time_points))  # 4-8 Hz
-        alpha_power = np.zeros(len(time_points))  # 8-13 Hz
+        seizure_mask = _build_seizure_mask(
+            self.rng.random(num_points),
+            seizure_probability / (duration_minutes * 60),
+            time_points,
+            2,  # 2-minute seizure
+            -1.0 if seizure_start_minute is None else float(seizure_start_minute),
+        )
         
-        seizure_active = False
-        
-        for i in range(len(time_points)):
-            current_minute = time_points[i] / 60
-            
-            # Check for seizure onset
-            if seizure_start_minute is None and np.random.random() < seizure_probability / (duration_minutes * 60):
-                seizure_start_minute = current_minute
-            
-            if seizure_start_minute is not None:
-                seizure_duration = 2  # 2-minute seizure
-                if current_minute < seizure_start_minute + seizure_duration:
-                    seizure_active = True
-                else:
-                    seizure_active = False
-                    seizure_start_minute = None
-            
-            if seizure_active:
-                # During seizure: high-frequency activity
-                delta_power[i] = np.random.uniform(50, 150)
-                theta_power[i] = np.random.uniform(100, 250)
-                alpha_power[i] = np.random.uniform(200, 400)
-            else:
-                # Normal EEG during hypothermia (slowed activity)
-                delta_power[i] = np.random.uniform(10, 40)
-                theta_power[i] = np.random.uniform(5, 20)
-                alpha_power[i] = np.random.uniform(2, 10)
+        # During seizure: high-frequency activity; otherwise normal EEG during
+        # hypothermia (slowed activity)
+        delta_power = np.where(seizure_mask, self.rng.uniform(50, 150, num_points), self.rng.uniform(10, 40, num_points))  # 0.5-4 Hz
+        theta_power = np.where(seizure_mask, self.rng.uniform(100, 250, num_points), self.rng.uniform(5, 20, num_points))  # 4-8 Hz
+        alpha_power = np.where(seizure_mask, self.rng.uniform(200, 400, num_points), self.rng.uniform(2, 10, num_points))  # 8-13 Hz
         
         return time_points, delta_power, theta_power, alpha_power
     
@@ -278,34 +345,43 @@ class InfantPhysiologicalDataGenerator:
         Returns pH, pCO2, pO2, lactate levels
         """
         
-        num_points = duration_hours // time_step_hours
         time_points = np.arange(0, duration_hours, time_step_hours)
+        pH_values, pco2_values, po2_values, lactate_values = self.generate_blood_gas_arrays(
+            np.array([hie_severity]), duration_hours, time_step_hours
+        )
         
-        # Normal newborn ABG values
-        pH_values = np.zeros(num_points)
-        pco2_values = np.zeros(num_points)
-        po2_values = np.zeros(num_points)
-        lactate_values = np.zeros(num_points)
+        return time_points, pH_values[0], pco2_values[0], po2_values[0], lactate_values[0]
+    
+    def generate_blood_gas_arrays(
+        self,
+        hie_severity: np.ndarray,
+        duration_hours: int,
+        time_step_hours: int = 4
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized ABG simulation for a cohort: returns pH, pCO2, pO2 and lactate
+        as (num_patients, num_measurements) arrays
+        """
+        
+        num_points = duration_hours // time_step_hours
+        steps = np.arange(num_points)
+        shape = (len(hie_severity), num_points)
         
         # Baseline depends on HIE severity
-        baselines = {
-            'mild': {'pH': 7.35, 'pCO2': 45, 'pO2': 85, 'lactate': 2},
-            'moderate': {'pH': 7.30, 'pCO2': 48, 'pO2': 75, 'lactate': 4},
-            'severe': {'pH': 7.25, 'pCO2': 50, 'pO2': 65, 'lactate': 8},
+        baseline = {
+            key: np.array([BLOOD_GAS_BASELINES[severity][key] for severity in hie_severity], dtype=float)[:, None]
+            for key in ('pH', 'pCO2', 'pO2', 'lactate')
         }
         
-        baseline = baselines[hie_severity]
+        # Gradual improvement over time with hypothermia
+        improvement_factor = 1 - (0.01 * steps)  # Slow improvement
         
-        for i in range(num_points):
-            # Gradual improvement over time with hypothermia
-            improvement_factor = 1 - (0.01 * i)  # Slow improvement
-            
-            pH_values[i] = baseline['pH'] + np.random.uniform(-0.05, 0.1) * improvement_factor
-            pco2_values[i] = baseline['pCO2'] + np.random.uniform(-5, 3) * improvement_factor
-            po2_values[i] = baseline['pO2'] + np.random.uniform(-10, 15) * improvement_factor
-            lactate_values[i] = baseline['lactate'] * (0.9 ** i) + np.random.uniform(-0.5, 0.5)
+        pH_values = baseline['pH'] + self.rng.uniform(-0.05, 0.1, shape) * improvement_factor
+        pco2_values = baseline['pCO2'] + self.rng.uniform(-5, 3, shape) * improvement_factor
+        po2_values = baseline['pO2'] + self.rng.uniform(-10, 15, shape) * improvement_factor
+        lactate_values = baseline['lactate'] * (0.9 ** steps) + self.rng.uniform(-0.5, 0.5, shape)
         
-        return time_points, pH_values, pco2_values, po2_values, lactate_values
+        return pH_values, pco2_values, po2_values, lactate_values
     
     def generate_complete_patient_dataset(
         self,
@@ -373,28 +449,17 @@ class InfantPhysiologicalDataGenerator:
             'target_temp_c': protocol['target_temp'],
         })
         
-        # Add blood gas data (every 4 hours)
-        time_points_abg, pH, pco2, po2, lactate = self.generate_blood_gas_data(
+        # Add blood gas data (every 4 hours), held constant until the next draw
+        _, pH, pco2, po2, lactate = self.generate_blood_gas_data(
             duration_hours,
             time_step_hours=4,
             hie_severity=baseline_params['hie_severity']
         )
-        
-        # Merge ABG data at appropriate times
-        abg_df = pd.DataFrame({
-            'time_hours': time_points_abg,
-            'pH': pH,
-            'pCO2_mmhg': pco2,
-            'pO2_mmhg': po2,
-            'lactate_mmol': lactate
-        })
-        
-        # Forward-fill ABG values to match 5-minute intervals
-        df['time_hours_abg'] = df['time_hours']
-        df = df.merge(abg_df, left_on='time_hours_abg', right_on='time_hours', how='left')
-        df[['pH', 'pCO2_mmhg', 'pO2_mmhg', 'lactate_mmol']] = \
-            df[['pH', 'pCO2_mmhg', 'pO2_mmhg', 'lactate_mmol']].fillna(method='ffill')
-        df = df.drop('time_hours_abg', axis=1)
+        abg_idx = np.minimum(time_points_vitals // (4 * 60), len(pH) - 1).astype(np.intp)
+        df['pH'] = pH[abg_idx]
+        df['pCO2_mmhg'] = pco2[abg_idx]
+        df['pO2_mmhg'] = po2[abg_idx]
+        df['lactate_mmol'] = lactate[abg_idx]
         
         # Add patient baseline info as columns
         for key, value in baseline_params.items():
@@ -406,23 +471,100 @@ class InfantPhysiologicalDataGenerator:
     def generate_batch_dataset(
         self,
         num_patients: int = 100,
-        duration_hours: int = 72
+        duration_hours: int = 72,
+        time_step_minutes: int = 5
     ) -> pd.DataFrame:
-        """Generate dataset for multiple patients"""
+        """
+        Generate dataset for multiple patients
         
-        datasets = []
-        for i in range(num_patients):
-            patient_id = f'PATIENT_{i+1:04d}'
-            print(f"Generating data for {patient_id}...")
-            
-            patient_df = self.generate_complete_patient_dataset(
-                patient_id,
-                duration_hours=duration_hours
-            )
-            datasets.append(patient_df)
-        
-        combined_df = pd.concat(datasets, ignore_index=True)
-        return combined_df
+        All patients are simulated at once: per-patient parameters are drawn
+        as arrays and broadcast against the shared time axis, and the time
+        series are written into a single float32 buffer (one row per patient
+        per time step) that backs the returned DataFrame.
+        """
+        
+        patient_ids = np.array([f'PATIENT_{i+1:04d}' for i in range(num_patients)], dtype=object)
+        baseline_params = self.generate_baseline_parameter_arrays(num_patients)
+        hie_severity = baseline_params['hie_severity']
+        protocol = self.generate_cooling_protocol_arrays(hie_severity)
+        
+        duration_minutes = duration_hours * 60
+        time_points = np.arange(0, duration_minutes, time_step_minutes)
+        num_steps = len(time_points)
+        
+        # Per-patient parameters as column vectors broadcast over time
+        def column(values):
+            return np.asarray(values)[:, None]
+        
+        buffer = np.empty((num_patients * num_steps, len(TIME_SERIES_COLUMNS)), dtype=np.float32)
+        series = buffer.reshape(num_patients, num_steps, len(TIME_SERIES_COLUMNS))
+        
+        def store(name, values):
+            series[:, :, TIME_SERIES_COLUMNS.index(name)] = values
+        
+        store('time_hours', time_points / 60)
+        _, rectal_temps = self.simulate_rectal_temperature(
+            column(baseline_params['baseline_rectal_temp']),
+            column(protocol['target_temp']),
+            column(protocol['cooling_rate']) / 60,  # Convert to °C/min
+            column(protocol['rewarming_rate']) / 60,
+            duration_minutes,
+            time_step_minutes
+        )
+        store('rectal_temperature_c', rectal_temps)
+        
+        _, heart_rates = self.generate_heart_rate_data(
+            column(baseline_params['baseline_heart_rate']),
+            duration_minutes,
+            time_step_minutes,
+            stress_level=0.5
+        )
+        store('heart_rate_bpm', heart_rates)
+        
+        _, systolic_bp, diastolic_bp = self.generate_blood_pressure_data(
+            column(baseline_params['baseline_systolic_bp']),
+            column(baseline_params['baseline_diastolic_bp']),
+            duration_minutes,
+            time_step_minutes
+        )
+        store('systolic_bp_mmhg', systolic_bp)
+        store('diastolic_bp_mmhg', diastolic_bp)
+        
+        _, spo2 = self.generate_oxygen_saturation_data(
+            column(baseline_params['baseline_oxygen_sat']),
+            duration_minutes,
+            time_step_minutes,
+            respiratory_distress=column(hie_severity == 'severe')
+        )
+        store('oxygen_saturation_percent', spo2)
+        store('target_temp_c', column(protocol['target_temp']))
+        
+        # Blood gas data (every 4 hours), held constant until the next draw
+        abg_step_hours = 4
+        abg_values = self.generate_blood_gas_arrays(hie_severity, duration_hours, abg_step_hours)
+        abg_idx = np.minimum(time_points // (abg_step_hours * 60), abg_values[0].shape[1] - 1).astype(np.intp)
+        for name, values in zip(['pH', 'pCO2_mmhg', 'pO2_mmhg', 'lactate_mmol'], abg_values):
+            store(name, values[:, abg_idx])
+        
+        columns = {
+            'patient_id': np.repeat(patient_ids, num_steps),
+            'time_minutes': np.tile(time_points, num_patients),
+        }
+        for index, name in enumerate(TIME_SERIES_COLUMNS):
+            columns[name] = buffer[:, index]
+        columns['hie_severity'] = np.repeat(hie_severity, num_steps)
+        
+        # Add patient baseline info as columns
+        for key, values in baseline_params.items():
+            columns[f'baseline_{key}'] = np.repeat(values, num_steps)
+        
+        column_order = [
+            'patient_id', 'time_minutes', 'time_hours', 'rectal_temperature_c',
+            'heart_rate_bpm', 'systolic_bp_mmhg', 'diastolic_bp_mmhg',
+            'oxygen_saturation_percent', 'hie_severity', 'target_temp_c',
+            'pH', 'pCO2_mmhg', 'pO2_mmhg', 'lactate_mmol',
+        ] + [f'baseline_{key}' for key in baseline_params]
+        return pd.DataFrame(columns)[column_order]
 
 
 # Example usage
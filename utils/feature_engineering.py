@@ -9,18 +9,136 @@ scripts, and inference services.
 Functions provided:
 - engineer_patient_timeseries_features(df): Per-patient rolling stats & gradients
 - add_clinical_labels(df): Derived risk flags and outcomes used for training
-- standardize_numeric_features(df, exclude_cols): StandardScaler transformation
-- build_feature_matrix(df, feature_cols): Return X matrix aligned to model features
+- standardize_numeric_features(df, exclude_cols): StandardScaler-equivalent transformation
+- build_feature_matrix(df, feature_cols, dtype): Return X matrix aligned to model features
 
 All functions avoid one-letter variable names and are designed for clarity.
 """
 
 from __future__ import annotations
 
+import threading
 from typing import List, Tuple, Dict
+import numexpr as ne
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
+from numba import njit, prange
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+
+# Per-thread single-row buffers reused by build_feature_matrix, keyed by (n_features, dtype)
+_SCRATCH = threading.local()
+
+# Raw columns read by engineer_patient_timeseries_features
+TIMESERIES_INPUT_COLUMNS = ["rectal_temp", "heart_rate", "systolic_bp", "diastolic_bp", "ph", "lactate"]
+# Outputs filled by _timeseries_feature_loop, in its argument order (hrv_proxy is added after)
+TIMESERIES_FEATURE_COLUMNS = [
+    "temp_grad_5m", "temp_grad_30m", "temp_grad_1h",
+    "hr_roll_mean", "hr_roll_std", "hr_roll_min", "hr_roll_max",
+    "map_mmHg", "pulse_pressure", "lactate_elev", "ph_dev_abs",
+]
+# Column order of the engineered features in the returned DataFrame
+TIMESERIES_OUTPUT_COLUMNS = TIMESERIES_FEATURE_COLUMNS[:7] + ["hrv_proxy"] + TIMESERIES_FEATURE_COLUMNS[7:]
+
+
+def _timeseries_feature_loop(temp, hr, sbp, dbp, ph, lactate, offsets, window,
+                               temp_grad_5m, temp_grad_30m, temp_grad_1h,
+                               hr_roll_mean, hr_roll_std, hr_roll_min, hr_roll_max,
+                               map_mmhg, pulse_pressure, lactate_elev, ph_dev_abs):
+    # One pass per patient; rows offsets[g]:offsets[g + 1] belong to patient g, in time order.
+    # HR mean/std come from a running sum/sum-of-squares (float64) over the trailing window,
+    # matching pandas rolling(window, min_periods=1) with NaNs skipped and ddof=1.
+    for g in prange(offsets.shape[0] - 1):
+        start = offsets[g]
+        end = offsets[g + 1]
+        run_sum = 0.0
+        run_sq = 0.0
+        run_count = 0
+        for i in range(start, end):
+            pos = i - start
+            temp_grad_5m[i] = temp[i] - temp[i - 1] if pos >= 1 else np.nan
+            temp_grad_30m[i] = temp[i] - temp[i - 6] if pos >= 6 else np.nan
+            temp_grad_1h[i] = temp[i] - temp[i - 12] if pos >= 12 else np.nan
+
+            value = np.float64(hr[i])
+            if not np.isnan(value):
+                run_sum += value
+                run_sq += value * value
+                run_count += 1
+            if pos >= window:
+                dropped = np.float64(hr[i - window])
+                if not np.isnan(dropped):
+                    run_sum -= dropped
+                    run_sq -= dropped * dropped
+                    run_count -= 1
+
+            if run_count > 0:
+                hr_roll_mean[i] = run_sum / run_count
+            else:
+                hr_roll_mean[i] = np.nan
+            if run_count > 1:
+                variance = (run_sq - run_sum * run_sum / run_count) / (run_count - 1)
+                hr_roll_std[i] = np.sqrt(variance) if variance > 0.0 else 0.0
+            else:
+                hr_roll_std[i] = 0.0
+
+            lo = max(start, i - window + 1)
+            roll_min = np.inf
+            roll_max = -np.inf
+            for j in range(lo, i + 1):
+                if hr[j] < roll_min:
+                    roll_min = hr[j]
+                if hr[j] > roll_max:
+                    roll_max = hr[j]
+            hr_roll_min[i] = roll_min if run_count > 0 else np.nan
+            hr_roll_max[i] = roll_max if run_count > 0 else np.nan
+
+            map_mmhg[i] = (sbp[i] + 2.0 * dbp[i]) / 3.0
+            pulse_pressure[i] = sbp[i] - dbp[i]
+            lactate_elev[i] = lactate[i] - 2.0
+            ph_dev_abs[i] = abs(ph[i] - 7.40)
+
+
+# No on-disk cache (cache=True): numba keys it to the importing module name, and this
+# module is imported both as utils.feature_engineering and as plain feature_engineering.
+# The batch path splits patients across threads with the parallel kernel. The single-patient
+# path (one group, called concurrently from request threads) uses the serial one, since
+# concurrent calls into a parallel kernel abort the process under numba's workqueue layer.
+_timeseries_feature_kernel = njit(parallel=True)(_timeseries_feature_loop)
+_timeseries_feature_kernel_serial = njit(_timeseries_feature_loop)
+# Serializes the parallel kernel for callers that run batches from several threads
+_PARALLEL_KERNEL_LOCK = threading.Lock()
+
+
+def _compute_features(temp: np.ndarray, hr: np.ndarray, sbp: np.ndarray, dbp: np.ndarray,
+                      ph: np.ndarray, lactate: np.ndarray, offsets: np.ndarray,
+                      parallel: bool = True) -> Dict[str, np.ndarray]:
+    """Run the feature kernel over float32 inputs; returns the features in output column order."""
+    features = {c: np.empty(len(temp), dtype=np.float32) for c in TIMESERIES_FEATURE_COLUMNS}
+    # Temperature gradients: 5-min (1 step), 30-min (6 steps), 1-hour (12 steps);
+    # heart rate rolling window (5 samples ≈ 25 minutes if 5-min sampling);
+    # blood pressure derived metrics and metabolic indicators
+    outputs = [features[c] for c in TIMESERIES_FEATURE_COLUMNS]
+    if parallel:
+        with _PARALLEL_KERNEL_LOCK:
+            _timeseries_feature_kernel(temp, hr, sbp, dbp, ph, lactate, offsets, 5, *outputs)
+    else:
+        _timeseries_feature_kernel_serial(temp, hr, sbp, dbp, ph, lactate, offsets, 5, *outputs)
+    # Simple HRV proxy: rolling std
+    features["hrv_proxy"] = features["hr_roll_std"]
+    return {c: features[c] for c in TIMESERIES_OUTPUT_COLUMNS}
+
+
+def _compute_features_single(temp: np.ndarray, hr: np.ndarray, sbp: np.ndarray, dbp: np.ndarray,
+                             ph: np.ndarray, lactate: np.ndarray) -> Dict[str, np.ndarray]:
+    """Features for one patient's time-ordered samples (the whole array is one group)."""
+    offsets = np.array([0, len(temp)], dtype=np.int64)
+    return _compute_features(temp, hr, sbp, dbp, ph, lactate, offsets, parallel=False)
+
+
+def _float32_inputs(df: pd.DataFrame) -> List[np.ndarray]:
+    # Vital signs are only ~3 significant digits, so features are computed in float32
+    return [np.ascontiguousarray(df[c].to_numpy(dtype=np.float32)) for c in TIMESERIES_INPUT_COLUMNS]
 
 
 def engineer_patient_timeseries_features(df: pd.DataFrame,
@@ -35,38 +153,46 @@ def engineer_patient_timeseries_features(df: pd.DataFrame,
 
     Returns a new DataFrame with added feature columns.
     """
-    df = df.sort_values([patient_id_col, time_col]).copy()
-
-    feature_frames = []
-    for patient_id, group in df.groupby(patient_id_col):
-        g = group.copy()
-
-        # Temperature gradients: 5-min (1 step), 30-min (6 steps), 1-hour (12 steps)
-        g["temp_grad_5m"] = g["rectal_temp"].diff(1)
-        g["temp_grad_30m"] = g["rectal_temp"].diff(6)
-        g["temp_grad_1h"] = g["rectal_temp"].diff(12)
-
-        # Heart rate rolling window (5 samples ≈ 25 minutes if 5-min sampling)
-        window = 5
-        g["hr_roll_mean"] = g["heart_rate"].rolling(window, min_periods=1).mean()
-        g["hr_roll_std"] = g["heart_rate"].rolling(window, min_periods=1).std().fillna(0.0)
-        g["hr_roll_min"] = g["heart_rate"].rolling(window, min_periods=1).min()
-        g["hr_roll_max"] = g["heart_rate"].rolling(window, min_periods=1).max()
-        # Simple HRV proxy: rolling std
-        g["hrv_proxy"] = g["hr_roll_std"]
-
-        # Blood pressure derived metrics
-        g["map_mmHg"] = (g["systolic_bp"] + 2.0 * g["diastolic_bp"]) / 3.0
-        g["pulse_pressure"] = g["systolic_bp"] - g["diastolic_bp"]
-
-        # Metabolic indicators
-        g["lactate_elev"] = g["lactate"] - 2.0
-        g["ph_dev_abs"] = (g["ph"] - 7.40).abs()
+    # groupby used to drop rows without a patient id; keep doing so
+    missing_id = df[patient_id_col].isna()
+    if missing_id.any():
+        df = df[~missing_id]
+
+    patient_ids = df[patient_id_col].to_numpy()
+    if len(df) and (patient_ids == patient_ids[0]).all():
+        return _engineer_single_patient_features(df, time_col)
+
+    # sort_values already returns a new frame; ignore_index avoids a second copy from reset_index
+    df = df.sort_values([patient_id_col, time_col], kind="mergesort", ignore_index=True)
+
+    # Rows are now contiguous per patient; offsets bound each patient's slice
+    patient_ids = df[patient_id_col].to_numpy()
+    new_group = np.empty(len(df), dtype=bool)
+    new_group[:1] = True
+    new_group[1:] = patient_ids[1:] != patient_ids[:-1]
+    offsets = np.append(np.flatnonzero(new_group), len(df)).astype(np.int64)
+
+    features = _compute_features(*_float32_inputs(df), offsets)
+
+    # df is the sorted copy owned by this call, so the feature arrays are attached to it directly
+    for col, values in features.items():
+        df[col] = values
+    return df
 
-        feature_frames.append(g)
 
-    out = pd.concat(feature_frames, axis=0).reset_index(drop=True)
-    return out
+def _engineer_single_patient_features(df: pd.DataFrame, time_col: str) -> pd.DataFrame:
+    """
+    Fast path for one patient's window (typical per-request inference): no group
+    detection, a time-only sort that is skipped when rows are already ordered, and
+    the output frame built in a single constructor call. Same result as the batch path.
+    """
+    if not df[time_col].is_monotonic_increasing:
+        df = df.take(np.argsort(df[time_col].to_numpy(), kind="stable"))
+    features = _compute_features_single(*_float32_inputs(df))
+    # Existing feature columns are overwritten in place, as in the batch path
+    columns = {c: df[c].array for c in df.columns}
+    columns.update(features)
+    return pd.DataFrame(columns)
 
 
 def add_clinical_labels(df: pd.DataFrame,
@@ -84,58 +210,108 @@ def add_clinical_labels(df: pd.DataFrame,
     """
     df = df.copy()
 
-    df["temp_undershoot_risk"] = (df["rectal_temp"] < (target_temp_low - 0.5)).astype(int)
-    df["temp_overshoot_risk"] = (df["rectal_temp"] > (target_temp_high + 0.5)).astype(int)
-
-    seizure_cond = (
-        (df["lactate"] > 4.0) |
-        (df["ph"] < 7.30) |
-        (df.get("hrv_proxy", pd.Series(0, index=df.index)) > 25.0)
-    )
-    df["seizure_risk_high"] = seizure_cond.astype(int)
-
-    df["cardiac_distress_flag"] = ((df["map_mmHg"] < 35.0) & (df["pulse_pressure"] < 20.0)).astype(int)
-
-    renal_cond = (
-        (df["map_mmHg"] < 35.0) &
-        (df["spo2"] < 92.0) &
-        (df["ph"] < 7.30)
-    )
-    df["renal_dysfunction_risk"] = renal_cond.astype(int)
+    # Comparisons produce 1-byte bools; viewing them as uint8 gives 0/1 flags without a copy
+    rectal_temp = df["rectal_temp"].to_numpy()
+    lactate = df["lactate"].to_numpy()
+    ph = df["ph"].to_numpy()
+    map_mmhg = df["map_mmHg"].to_numpy()
+
+    df["temp_undershoot_risk"] = (rectal_temp < (target_temp_low - 0.5)).view(np.uint8)
+    df["temp_overshoot_risk"] = (rectal_temp > (target_temp_high + 0.5)).view(np.uint8)
+
+    # Compound conditions are fused by numexpr into one threaded pass over the inputs
+    columns = {
+        "lactate": lactate,
+        "ph": ph,
+        "map_mmhg": map_mmhg,
+        "pulse_pressure": df["pulse_pressure"].to_numpy(),
+        "spo2": df["spo2"].to_numpy(),
+    }
+    if "hrv_proxy" in df.columns:
+        columns["hrv"] = df["hrv_proxy"].to_numpy()
+        seizure_expr = "(lactate > 4.0) | (ph < 7.30) | (hrv > 25.0)"
+    else:
+        seizure_expr = "(lactate > 4.0) | (ph < 7.30)"
+    df["seizure_risk_high"] = ne.evaluate(seizure_expr, local_dict=columns).view(np.uint8)
+
+    df["cardiac_distress_flag"] = ne.evaluate(
+        "(map_mmhg < 35.0) & (pulse_pressure < 20.0)", local_dict=columns
+    ).view(np.uint8)
+
+    df["renal_dysfunction_risk"] = ne.evaluate(
+        "(map_mmhg < 35.0) & (spo2 < 92.0) & (ph < 7.30)", local_dict=columns
+    ).view(np.uint8)
 
     return df
 
 
 def standardize_numeric_features(df: pd.DataFrame,
-                                 exclude_cols: List[str] | None = None) -> Tuple[pd.DataFrame, Dict[str, float], Dict[str, float]]:
+                                 exclude_cols: List[str] | None = None,
+                                 numeric_cols: List[str] | None = None) -> Tuple[pd.DataFrame, Dict[str, float], Dict[str, float]]:
     """
     Standardize numeric columns (mean=0, std=1) while excluding identifiers
     or categorical columns.
 
+    Callers that standardize many batches with the same schema can pass numeric_cols
+    (computed once) to skip the per-call dtype scan; exclude_cols still applies.
+
     Returns standardized DataFrame along with mean and std per column for reproducibility.
     """
-    if exclude_cols is None:
-        exclude_cols = []
-
-    df = df.copy()
-    numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    numeric_cols = [c for c in numeric_cols if c not in exclude_cols]
-
-    scaler = StandardScaler()
-    df[numeric_cols] = scaler.fit_transform(df[numeric_cols])
-
-    means = {c: float(m) for c, m in zip(numeric_cols, scaler.mean_)}
-    stds = {c: float(s) for c, s in zip(numeric_cols, scaler.scale_)}
+    exclude = set(exclude_cols or ())
+    if numeric_cols is None:
+        numeric_cols = [c for c, dt in df.dtypes.items()
+                        if is_numeric_dtype(dt) and not is_bool_dtype(dt) and c not in exclude]
+    else:
+        numeric_cols = [c for c in numeric_cols if c not in exclude]
+
+    # Shallow copy: the standardized columns are assigned as new arrays, so the caller's data is untouched
+    df = df.copy(deep=False)
+
+    # Same statistics as StandardScaler: NaNs ignored, population std (ddof=0), zero std -> 1
+    block = df[numeric_cols].to_numpy(dtype=np.float32, copy=True)
+    mean = np.nanmean(block, axis=0, dtype=np.float64)
+    std = np.nanstd(block, axis=0, dtype=np.float64)
+    std[std == 0.0] = 1.0
+    np.subtract(block, mean.astype(np.float32), out=block)
+    np.divide(block, std.astype(np.float32), out=block)
+    df[numeric_cols] = block
+
+    means = {c: float(m) for c, m in zip(numeric_cols, mean)}
+    stds = {c: float(s) for c, s in zip(numeric_cols, std)}
     return df, means, stds
 
 
-def build_feature_matrix(df: pd.DataFrame, feature_cols: List[str]) -> np.ndarray:
+def build_feature_matrix(df: pd.DataFrame,
+                         feature_cols: List[str],
+                         dtype=np.float32) -> np.ndarray:
     """
     Construct the feature matrix X in the exact order expected by trained models.
     Missing columns will raise a KeyError to avoid silent misalignment.
+
+    X is C-contiguous float32 by default; pass dtype=np.float64 where full precision is needed.
+
+    For a single-row df (per-request inference) X is a per-thread scratch buffer that is
+    reused and overwritten by the next single-row call on the same thread; copy it if
+    it must outlive that.
     """
-    for col in feature_cols:
-        if col not in df.columns:
-            raise KeyError(f"Required feature '{col}' not found in DataFrame")
-    X = df[feature_cols].to_numpy(dtype=float)
+    missing = set(feature_cols).difference(df.columns)
+    if missing:
+        first_missing = next(c for c in feature_cols if c in missing)
+        raise KeyError(f"Required feature '{first_missing}' not found in DataFrame")
+
+    if len(df) == 1:
+        buffers = getattr(_SCRATCH, "buffers", None)
+        if buffers is None:
+            buffers = _SCRATCH.buffers = {}
+        key = (len(feature_cols), np.dtype(dtype))
+        X = buffers.get(key)
+        if X is None:
+            X = buffers[key] = np.empty((1, len(feature_cols)), dtype=dtype)
+        for i, col in enumerate(feature_cols):
+            value = df[col].iat[0]
+            # nullable columns (Float64, Int64, boolean) hold pd.NA; the batch path maps it to NaN
+            X[0, i] = np.nan if value is pd.NA else value
+        return X
+
+    X = np.ascontiguousarray(df.loc[:, feature_cols].to_numpy(dtype=dtype, copy=False))
     return X
@@ -3,9 +3,11 @@ Model training and evaluation utilities for the Personalized Adaptive Hypothermi
 
 This module consolidates common ML tasks used in Phase 3 and future phases:
 - split_train_test: deterministic train/test split
-- train_temperature_models: train RF, GradientBoosting, MLP regressors
+- train_temperature_models: train RF, HistGradientBoosting, MLP regressors
+- TorchMLPRegressor: PyTorch MLP with an sklearn fit/predict interface (optional)
+- QuantizedForestRegressor: compact uint8-leaf random forest used when saving models
 - evaluate_regression: RMSE, MAE, R2 metrics
-- save_models: persist models and metadata to disk
+- save_models: persist models (joblib, LZ4-compressed) and metadata to disk
 - load_model_and_features: helper to load model and feature list for inference
 
 Designed for clarity and minimal external dependencies.
@@ -16,49 +18,327 @@ from __future__ import annotations
 from typing import Dict, Tuple, List
 import os
 import json
-import pickle
+from functools import lru_cache
+import joblib
 import numpy as np
+import orjson
+from joblib import Parallel, cpu_count, delayed
+from numba import njit
 
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.base import BaseEstimator, RegressorMixin
 from sklearn.neural_network import MLPRegressor
 
+# PyTorch is optional: without it the temperature MLP falls back to sklearn's MLPRegressor
+try:
+    import torch
+    from torch import nn
+    from torch.utils.data import DataLoader, TensorDataset
+except ImportError:
+    torch = None
+
+# LZ4 decompresses at GB/s, so compressed models load faster than raw pickles; zlib if lz4 is missing
+try:
+    import lz4  # noqa: F401
+    MODEL_COMPRESSION = ("lz4", 3)
+except ImportError:
+    MODEL_COMPRESSION = ("zlib", 3)
+
 
 def split_train_test(X: np.ndarray, y: np.ndarray, test_size: float = 0.2, random_state: int = 42):
     return train_test_split(X, y, test_size=test_size, random_state=random_state)
 
 
+class TorchMLPRegressor(RegressorMixin, BaseEstimator):
+    """
+    sklearn-compatible MLP regressor trained with PyTorch (Adam, mini-batches).
+
+    Mirrors the MLPRegressor settings used for the temperature model, with early
+    stopping on a held-out validation split. Trains on CUDA when available. The
+    fitted weights are kept as NumPy arrays (coefs_/intercepts_, as in MLPRegressor)
+    and predict() is plain NumPy, so a saved model loads and predicts without torch.
+    """
+
+    def __init__(self, hidden_layer_sizes=(128, 64, 32), learning_rate_init=0.001, max_iter=500,
+                 batch_size=1024, early_stopping=True, validation_fraction=0.1,
+                 n_iter_no_change=10, tol=1e-4, random_state=None, device=None):
+        self.hidden_layer_sizes = hidden_layer_sizes
+        self.learning_rate_init = learning_rate_init
+        self.max_iter = max_iter
+        self.batch_size = batch_size
+        self.early_stopping = early_stopping
+        self.validation_fraction = validation_fraction
+        self.n_iter_no_change = n_iter_no_change
+        self.tol = tol
+        self.random_state = random_state
+        self.device = device
+
+    def _build_network(self, n_features: int):
+        layers = []
+        in_size = n_features
+        for size in self.hidden_layer_sizes:
+            layers += [nn.Linear(in_size, size), nn.ReLU()]
+            in_size = size
+        layers.append(nn.Linear(in_size, 1))
+        return nn.Sequential(*layers)
+
+    def fit(self, X: np.ndarray, y: np.ndarray):
+        if torch is None:
+            raise ImportError("TorchMLPRegressor requires PyTorch; use sklearn's MLPRegressor instead")
+        if self.random_state is not None:
+            torch.manual_seed(self.random_state)
+        device = torch.device(self.device or ("cuda" if torch.cuda.is_available() else "cpu"))
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.ascontiguousarray(y, dtype=np.float32).reshape(-1, 1)
+        self.n_features_in_ = X.shape[1]
+
+        X_val = y_val = None
+        if self.early_stopping:
+            X, X_val, y, y_val = train_test_split(X, y, test_size=self.validation_fraction, random_state=self.random_state)
+            X_val = torch.from_numpy(X_val).to(device)
+            y_val = torch.from_numpy(y_val).to(device)
+
+        loader = DataLoader(TensorDataset(torch.from_numpy(X), torch.from_numpy(y)),
+                            batch_size=self.batch_size, shuffle=True)
+        network = self._build_network(self.n_features_in_).to(device)
+        optimizer = torch.optim.Adam(network.parameters(), lr=self.learning_rate_init)
+        loss_fn = nn.MSELoss()
+
+        best_loss = np.inf
+        best_state = None
+        epochs_without_improvement = 0
+        self.n_iter_ = 0
+        for epoch in range(self.max_iter):
+            self.n_iter_ = epoch + 1
+            network.train()
+            epoch_loss = 0.0
+            for X_batch, y_batch in loader:
+                X_batch = X_batch.to(device, non_blocking=True)
+                y_batch = y_batch.to(device, non_blocking=True)
+                optimizer.zero_grad()
+                loss = loss_fn(network(X_batch), y_batch)
+                loss.backward()
+                optimizer.step()
+                epoch_loss += loss.item() * len(X_batch)
+            epoch_loss /= len(loader.dataset)
+
+            if self.early_stopping:
+                network.eval()
+                with torch.no_grad():
+                    epoch_loss = loss_fn(network(X_val), y_val).item()
+            if epoch_loss < best_loss - self.tol:
+                best_loss = epoch_loss
+                best_state = {k: v.detach().clone() for k, v in network.state_dict().items()}
+                epochs_without_improvement = 0
+            else:
+                epochs_without_improvement += 1
+                if epochs_without_improvement >= self.n_iter_no_change:
+                    break
+
+        if best_state is not None:
+            network.load_state_dict(best_state)
+        self.best_loss_ = float(best_loss)
+        linear_layers = [layer for layer in network if isinstance(layer, nn.Linear)]
+        self.coefs_ = [layer.weight.detach().cpu().numpy().T.copy() for layer in linear_layers]
+        self.intercepts_ = [layer.bias.detach().cpu().numpy().copy() for layer in linear_layers]
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        activations = np.ascontiguousarray(X, dtype=np.float32)
+        last = len(self.coefs_) - 1
+        for i, (coef, intercept) in enumerate(zip(self.coefs_, self.intercepts_)):
+            activations = activations @ coef + intercept
+            if i < last:
+                np.maximum(activations, 0.0, out=activations)
+        return activations.ravel().astype(np.float64)
+
+
+class QuantizedForestRegressor(RegressorMixin, BaseEstimator):
+    """
+    Compact, predict-only copy of a fitted single-output RandomForestRegressor.
+
+    The trees are flattened into shared node arrays (children, split feature, threshold)
+    and each tree's leaf values are quantized to uint8 with a per-tree (lo, scale):
+    value ≈ lo + scale * q. The error per tree is at most half a step, (max - min) / 510,
+    and averaging over trees shrinks it further. predict() walks the flat arrays in a
+    compiled loop (_quantized_forest_predict); NaN features follow each split's
+    missing_go_to_left, as in sklearn.
+    """
+
+    def __init__(self, forest: RandomForestRegressor):
+        if forest.n_outputs_ != 1:
+            raise ValueError("QuantizedForestRegressor supports single-output forests only")
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        sizes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        self.n_features_in_ = forest.n_features_in_
+        self.n_trees_ = len(trees)
+        self.roots_ = offsets.astype(np.int64)
+        # Children are re-based into the flat arrays; -1 still marks a leaf
+        self.children_left_ = np.concatenate(
+            [np.where(t.children_left >= 0, t.children_left + off, -1) for t, off in zip(trees, offsets)]
+        ).astype(np.int32)
+        self.children_right_ = np.concatenate(
+            [np.where(t.children_right >= 0, t.children_right + off, -1) for t, off in zip(trees, offsets)]
+        ).astype(np.int32)
+        self.feature_ = np.concatenate([t.feature for t in trees]).astype(np.int32)
+        self.threshold_ = np.concatenate([t.threshold for t in trees])
+        self.missing_go_to_left_ = np.concatenate([t.missing_go_to_left for t in trees]).astype(np.bool_)
+
+        values = np.concatenate([t.value[:, 0, 0] for t in trees])
+        node_tree = np.repeat(np.arange(self.n_trees_), sizes)
+        is_leaf = self.children_left_ == -1
+        leaf_lo = np.full(self.n_trees_, np.inf)
+        leaf_hi = np.full(self.n_trees_, -np.inf)
+        np.minimum.at(leaf_lo, node_tree[is_leaf], values[is_leaf])
+        np.maximum.at(leaf_hi, node_tree[is_leaf], values[is_leaf])
+        scale = (leaf_hi - leaf_lo) / 255.0
+        scale[scale == 0.0] = 1.0
+        self.leaf_lo_ = leaf_lo
+        self.leaf_scale_ = scale
+        self.leaf_q_ = np.zeros(len(values), dtype=np.uint8)
+        self.leaf_q_[is_leaf] = np.round(
+            (values[is_leaf] - leaf_lo[node_tree[is_leaf]]) / scale[node_tree[is_leaf]]
+        ).astype(np.uint8)
+
+    @classmethod
+    def _get_param_names(cls):
+        # The source forest is converted, not kept, so there are no parameters to report
+        return []
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # sklearn trees compare float32 features against float64 thresholds; do the same
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        # The compiled traversal does no bounds checking, so reject mis-shaped input here
+        if X.ndim != 2:
+            raise ValueError(f"Expected 2D array, got {X.ndim}D array instead")
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but QuantizedForestRegressor is expecting "
+                f"{self.n_features_in_} features as input."
+            )
+        out = np.empty(X.shape[0], dtype=np.float64)
+        _quantized_forest_predict(X, self.roots_, self.children_left_, self.children_right_,
+                                  self.feature_, self.threshold_, self.missing_go_to_left_,
+                                  self.leaf_lo_, self.leaf_scale_, self.leaf_q_, out)
+        return out
+
+
+@njit
+def _quantized_forest_predict(X, roots, children_left, children_right, feature, threshold,
+                              missing_go_to_left, leaf_lo, leaf_scale, leaf_q, out):
+    # Tree by tree over all samples, so each tree's nodes stay in cache; memory stays
+    # O(n_samples), and the loop is serial so concurrent callers never share numba's
+    # parallel thread pool.
+    n_trees = roots.shape[0]
+    out[:] = 0.0
+    for t in range(n_trees):
+        root = roots[t]
+        for i in range(X.shape[0]):
+            node = root
+            while children_left[node] != -1:
+                value = X[i, feature[node]]
+                if np.isnan(value):
+                    go_left = missing_go_to_left[node]
+                else:
+                    go_left = value <= threshold[node]
+                node = children_left[node] if go_left else children_right[node]
+            out[i] += leaf_lo[t] + leaf_scale[t] * leaf_q[node]
+    out /= n_trees
+
+
+def _compact_for_saving(model):
+    # Random forests are stored quantized; other estimators are saved as-is
+    if isinstance(model, RandomForestRegressor) and model.n_outputs_ == 1:
+        return QuantizedForestRegressor(model)
+    return model
+
+
+def _fit_estimator(name: str, estimator, X_train: np.ndarray, y_train: np.ndarray):
+    estimator.fit(X_train, y_train)
+    return name, estimator
+
+
 def train_temperature_models(X_train: np.ndarray, y_train: np.ndarray, random_state: int = 42) -> Dict[str, object]:
     """
     Train three competing regression models for temperature prediction.
     Returns a dict of model_name -> fitted estimator.
     """
-    models = {}
+    # The three models train side by side (below), so the forest gets a third of the cores
+    # rather than all of them, which would oversubscribe the CPU.
+    rf_jobs = max(1, cpu_count() // 3)
+    estimators = [
+        ("random_forest", RandomForestRegressor(n_estimators=100, max_depth=15, n_jobs=rf_jobs, random_state=random_state)),
+        ("gradient_boosting", HistGradientBoostingRegressor(max_iter=100, learning_rate=0.1, max_depth=5, early_stopping=True, random_state=random_state)),
+        ("mlp", TorchMLPRegressor(hidden_layer_sizes=(128, 64, 32), learning_rate_init=0.001, max_iter=500, early_stopping=True, random_state=random_state)
+                if torch is not None else
+                MLPRegressor(hidden_layer_sizes=(128, 64, 32), learning_rate_init=0.001, max_iter=500, early_stopping=True, random_state=random_state)),
+    ]
 
-    rf = RandomForestRegressor(n_estimators=100, max_depth=15, random_state=random_state)
-    rf.fit(X_train, y_train)
-    models["random_forest"] = rf
+    # The three fits are independent, so run them in separate processes
+    fitted = Parallel(n_jobs=len(estimators))(
+        delayed(_fit_estimator)(name, estimator, X_train, y_train) for name, estimator in estimators
+    )
+    return dict(fitted)
 
-    gb = GradientBoostingRegressor(n_estimators=100, learning_rate=0.1, max_depth=5, random_state=random_state)
-    gb.fit(X_train, y_train)
-    models["gradient_boosting"] = gb
 
-    mlp = MLPRegressor(hidden_layer_sizes=(128, 64, 32), learning_rate_init=0.001, max_iter=500, early_stopping=True, random_state=random_state)
-    mlp.fit(X_train, y_train)
-    models["mlp"] = mlp
+@njit(fastmath=True)
+def _regression_sums(preds, targets):
+    # Single pass over both arrays; callers validate shape and finiteness first (numba does
+    # no bounds checks, and fastmath assumes no NaN/inf). Targets are shifted by the first value before
+    # squaring so ss_tot does not lose precision when y has a large mean (e.g. °C).
+    shift = targets[0]
+    sse = 0.0
+    sae = 0.0
+    sum_y = 0.0
+    sum_y_sq = 0.0
+    for i in range(targets.shape[0]):
+        diff = np.float64(preds[i]) - np.float64(targets[i])
+        sse += diff * diff
+        sae += abs(diff)
+        centered = np.float64(targets[i]) - shift
+        sum_y += centered
+        sum_y_sq += centered * centered
+    return sse, sae, sum_y, sum_y_sq
 
-    return models
+
+def _as_1d_float64(values, name: str) -> np.ndarray:
+    # Same input rules as sklearn's metrics: one column of finite numbers
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim == 2 and array.shape[1] == 1:
+        array = array[:, 0]
+    if array.ndim != 1:
+        raise ValueError(f"{name} must be 1-dimensional, got shape {array.shape}")
+    if not np.isfinite(array).all():
+        raise ValueError(f"Input {name} contains NaN or infinity")
+    return np.ascontiguousarray(array)
 
 
 def evaluate_regression(model, X_test: np.ndarray, y_test: np.ndarray) -> Dict[str, float]:
     """
     Compute RMSE, MAE, and R2 for a regression model.
     """
-    preds = model.predict(X_test)
-    rmse = float(np.sqrt(mean_squared_error(y_test, preds)))
-    mae = float(mean_absolute_error(y_test, preds))
-    r2 = float(r2_score(y_test, preds))
+    preds = _as_1d_float64(model.predict(X_test), "predictions")
+    targets = _as_1d_float64(y_test, "y_test")
+    if preds.shape != targets.shape:
+        raise ValueError(f"Found input variables with inconsistent numbers of samples: "
+                         f"{[targets.shape[0], preds.shape[0]]}")
+    n = targets.shape[0]
+    if n == 0:
+        raise ValueError("Cannot evaluate a regression model on 0 samples")
+    sse, sae, sum_y, sum_y_sq = _regression_sums(preds, targets)
+
+    ss_tot = sum_y_sq - sum_y * sum_y / n
+    rmse = float(np.sqrt(sse / n))
+    mae = float(sae / n)
+    # Same convention as sklearn's r2_score for a constant target
+    if ss_tot > 0.0:
+        r2 = float(1.0 - sse / ss_tot)
+    else:
+        r2 = 1.0 if sse == 0.0 else 0.0
     return {"rmse": rmse, "mae": mae, "r2": r2}
 
 
@@ -82,36 +362,55 @@ def save_models(models: Dict[str, object], feature_cols: List[str], results: Dic
     - models/temperature_optimization_model.pkl for the selected best
     - models/temperature_model_results.json with metrics
     - models/temperature_model_features.json with feature list order
+
+    Random forests are saved quantized, but `results` were measured on the original
+    forests; their entries in the results file are marked "metrics_before_quantization": true.
     """
     os.makedirs(output_dir, exist_ok=True)
 
-    # Save individual variants
-    for name, model in models.items():
-        with open(os.path.join(output_dir, f"temperature_model_{name}.pkl"), "wb") as f:
-            pickle.dump(model, f)
+    # Save individual variants (joblib-compressed; the .pkl names are kept for existing loaders)
+    # Random forests are saved as QuantizedForestRegressor (uint8 leaves, flattened trees)
+    compact = {name: _compact_for_saving(model) for name, model in models.items()}
+    for name, model in compact.items():
+        joblib.dump(model, os.path.join(output_dir, f"temperature_model_{name}.pkl"), compress=MODEL_COMPRESSION)
 
     # Decide best by RMSE if present in results
     best_name = select_best_model(results, by="rmse") if results else "gradient_boosting"
 
     # Save best as optimization model
-    with open(os.path.join(output_dir, "temperature_optimization_model.pkl"), "wb") as f:
-        pickle.dump(models[best_name], f)
+    joblib.dump(compact[best_name], os.path.join(output_dir, "temperature_optimization_model.pkl"), compress=MODEL_COMPRESSION)
 
     # Save metrics and feature columns
-    with open(os.path.join(output_dir, "temperature_model_results.json"), "w") as f:
-        json.dump(results, f, indent=2)
+    saved_results = {
+        name: {**metrics, "metrics_before_quantization": True}
+        if isinstance(compact.get(name), QuantizedForestRegressor) else metrics
+        for name, metrics in results.items()
+    }
+    with open(os.path.join(output_dir, "temperature_model_results.json"), "wb") as f:
+        f.write(orjson.dumps(saved_results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
-    with open(os.path.join(output_dir, "temperature_model_features.json"), "w") as f:
-        json.dump(feature_cols, f, indent=2)
+    with open(os.path.join(output_dir, "temperature_model_features.json"), "wb") as f:
+        f.write(orjson.dumps(feature_cols, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+
+
+@lru_cache(maxsize=4)
+def _cached_load(model_path: str, feature_path: str, model_mtime_ns: int, feature_mtime_ns: int) -> Tuple[object, Tuple[str, ...]]:
+    # joblib.load also reads models saved with plain pickle
+    model = joblib.load(model_path)
+    with open(feature_path, "r") as f:
+        feature_cols = tuple(json.load(f))
+    return model, feature_cols
 
 
 def load_model_and_features(model_path: str = "models/temperature_optimization_model.pkl",
                             feature_path: str = "models/temperature_model_features.json") -> Tuple[object, List[str]]:
     """
     Helper to load model + feature ordering for inference services.
+
+    Loads are cached per path and file modification time, so repeated calls are a dict
+    lookup and re-saved files are picked up automatically. The model object is shared
+    between callers.
     """
-    with open(model_path, "rb") as f:
-        model = pickle.load(f)
-    with open(feature_path, "r") as f:
-        feature_cols = json.load(f)
-    return model, feature_cols
+    model, feature_cols = _cached_load(model_path, feature_path,
+                                       os.stat(model_path).st_mtime_ns, os.stat(feature_path).st_mtime_ns)
+    return model, list(feature_cols)